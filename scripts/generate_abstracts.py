@@ -4,18 +4,98 @@
 将所有词典的摘要信息预处理到一个表中，供气泡快速查询
 """
 
+import os
 import sqlite3
 import json
 import re
+from collections import deque
+from itertools import groupby, islice
+from multiprocessing import Pool
+from operator import itemgetter
 from pathlib import Path
+from typing import Iterator
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
+
+# 每批从数据源读取并交给进程池计算的行数；
+# 进程池中最多同时排队 进程数 + 1 批，读取、计算和写入交错进行，内存占用有界
+BATCH_SIZE = 1000
+
+# 多进程计算时每个任务块的行数
+COMPUTE_CHUNK_SIZE = 250
+
+# 每处理这么多词输出一次进度
+PROGRESS_INTERVAL = 10000
+
+_WS_RE = re.compile(r'\s+')
+
+# 读取数据源依赖的 LOWER(word) 索引；dict.db 可能由旧版脚本生成，缺少时在此补建，
+# 否则下面按小写词的查找会逐词全表扫描
+SOURCE_INDEXES_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_words_word_lower ON words(LOWER(word))",
+    "CREATE INDEX IF NOT EXISTS idx_gpt4_words_word_lower ON gpt4_words(LOWER(word))",
+    # 只读取非链接词条，部分索引供扫描小写词和按小写词查找记录
+    "CREATE INDEX IF NOT EXISTS idx_collins_notlink ON collins_words(LOWER(word)) WHERE is_link = 0",
+    "CREATE INDEX IF NOT EXISTS idx_etyma_notlink ON etyma_words(LOWER(word)) WHERE is_link = 0",
+)
+
+# 所有出现过的小写词：只扫描 LOWER(word) 索引，不读取 content
+# （INDEXED BY 指定的索引由 SOURCE_INDEXES_SQL 保证存在）
+# SQLite 的 LOWER() 只转换 ASCII，应用端按 Unicode 小写查询，
+# 因此再用 py_lower（即 str.lower）折叠一次，作为 word_abstracts 的词；
+# 同一折叠词可能对应多个 LOWER(word)（如 "Émigré" 与 "émigré"），各占一行
+# 以 (word, k) 为主键，按主键顺序读出即按折叠后的词有序；
+# k 不声明类型（无亲和性），与 LOWER(word) 比较时才能走表达式索引
+CREATE_KEYS_SQL = """
+    CREATE TEMP TABLE abstract_keys (
+        word TEXT NOT NULL,
+        k NOT NULL,
+        PRIMARY KEY (word, k)
+    ) WITHOUT ROWID
+"""
+INSERT_KEYS_SQL = """
+    INSERT INTO abstract_keys (word, k)
+    SELECT py_lower(k), k FROM (
+        SELECT LOWER(word) AS k FROM words INDEXED BY idx_words_word_lower
+        UNION SELECT LOWER(word) FROM collins_words WHERE is_link = 0
+        UNION SELECT LOWER(word) FROM etyma_words WHERE is_link = 0
+        UNION SELECT LOWER(word) FROM gpt4_words INDEXED BY idx_gpt4_words_word_lower
+    )
+"""
+
+# 每个小写词在各表中按索引取 id 最大（即最后插入）的一条记录
+SOURCES_SQL = """
+    SELECT abstract_keys.word,
+           w.id, w.phonetic_us, w.phonetic_uk, w.content,
+           c.id, c.content, e.id, e.content, g.id, g.content
+    FROM abstract_keys
+    LEFT JOIN words w ON w.id =
+        (SELECT MAX(id) FROM words WHERE LOWER(word) = abstract_keys.k)
+    LEFT JOIN collins_words c ON c.id =
+        (SELECT MAX(id) FROM collins_words WHERE LOWER(word) = abstract_keys.k AND is_link = 0)
+    LEFT JOIN etyma_words e ON e.id =
+        (SELECT MAX(id) FROM etyma_words WHERE LOWER(word) = abstract_keys.k AND is_link = 0)
+    LEFT JOIN gpt4_words g ON g.id =
+        (SELECT MAX(id) FROM gpt4_words WHERE LOWER(word) = abstract_keys.k)
+    ORDER BY abstract_keys.word
+"""
+
+# SOURCES_SQL 结果行中各数据源的列范围，每段以该来源记录的 id 开头
+_SOURCE_SLICES = ((1, 5), (5, 7), (7, 9), (9, 11))
 
 
 def extract_main_def(content_str: str) -> tuple[str, str, str]:
     """从主词典提取音标和释义"""
+    if not content_str or content_str in ("{}", "null"):
+        return "", "", ""
     try:
-        data = json.loads(content_str)
-        content = data.get("content", {})
-        word_data = content.get("word", {}).get("content", {})
+        data = json_loads(content_str)
+        # 词条结构固定，直接下标取值；缺少任一层时与空词条结果相同
+        word_data = data["content"]["word"]["content"]
 
         # 提取音标
         phonetic = ""
@@ -36,14 +116,16 @@ def extract_main_def(content_str: str) -> tuple[str, str, str]:
                 defs.append(tran)
 
         return phonetic, "; ".join(defs), ""
-    except:
+    except (KeyError, ValueError, TypeError, AttributeError):
         return "", "", ""
 
 
 def extract_collins_def(content_str: str) -> tuple[str, str]:
     """从柯林斯提取音标和释义"""
+    if not content_str or content_str in ("{}", "null"):
+        return "", ""
     try:
-        data = json.loads(content_str)
+        data = json_loads(content_str)
         if not data:
             return "", ""
 
@@ -58,21 +140,23 @@ def extract_collins_def(content_str: str) -> tuple[str, str]:
             cn = d.get("cn", "")
             if cn:
                 # 清理释义中的多余空格
-                cn = re.sub(r'\s+', ' ', cn).strip()
+                cn = _WS_RE.sub(' ', cn).strip()
                 if pos:
                     defs.append(f"{pos} {cn}")
                 else:
                     defs.append(cn)
 
         return phonetic, "; ".join(defs)
-    except:
+    except (ValueError, TypeError, AttributeError):
         return "", ""
 
 
 def extract_etyma_def(content_str: str) -> str:
     """从词根词缀提取词源"""
+    if not content_str or content_str in ("{}", "null"):
+        return ""
     try:
-        data = json.loads(content_str)
+        data = json_loads(content_str)
         if not data:
             return ""
 
@@ -84,34 +168,128 @@ def extract_etyma_def(content_str: str) -> str:
         elif root:
             return root
         return ""
-    except:
+    except (ValueError, TypeError, AttributeError):
         return ""
 
 
 def extract_gpt4_def(content_str: str) -> str:
     """从 GPT4 提取简短释义"""
-    try:
-        # GPT4 内容是 Markdown，提取第一段有意义的内容
-        lines = content_str.split("\n")
-        for line in lines:
-            line = line.strip()
-            # 跳过标题和空行
-            if not line or line.startswith("#"):
-                continue
-            # 跳过太短的行
-            if len(line) < 10:
-                continue
-            # 返回第一段内容（截断到100字符）
-            return line[:100] + ("..." if len(line) > 100 else "")
-        return ""
-    except:
+    if not content_str:
         return ""
 
+    # GPT4 内容是 Markdown，提取第一段有意义的内容
+    # 逐行查找，找到即返回，不为整篇内容构建行列表
+    start = 0
+    length = len(content_str)
+    while start <= length:
+        end = content_str.find("\n", start)
+        if end < 0:
+            end = length
+        line = content_str[start:end].strip()
+        start = end + 1
+        # 跳过标题和空行
+        if not line or line.startswith("#"):
+            continue
+        # 跳过太短的行
+        if len(line) < 10:
+            continue
+        # 返回第一段内容（截断到100字符）
+        return line[:100] + ("..." if len(line) > 100 else "")
+    return ""
+
+
+def compute_abstract_row(source_row: tuple) -> tuple:
+    """由合并后的一行数据源生成 abstract 行（在工作进程中执行）"""
+    word, phonetic_us, phonetic_uk, main_content, collins_content, etyma_content, gpt4_content = source_row
+    phonetic = ""
+    main_def = ""
+    collins_def = ""
+    etyma_def = ""
+    gpt4_def = ""
+
+    # 主词典
+    if main_content is not None:
+        phonetic = phonetic_us or phonetic_uk or ""
+        _, main_def, _ = extract_main_def(main_content)
+
+    # 柯林斯
+    if collins_content is not None:
+        p, collins_def = extract_collins_def(collins_content)
+        if not phonetic and p:
+            phonetic = p
+
+    # 词根词缀
+    if etyma_content is not None:
+        etyma_def = extract_etyma_def(etyma_content)
+
+    # GPT4
+    if gpt4_content is not None:
+        gpt4_def = extract_gpt4_def(gpt4_content)
+
+    return word, phonetic, main_def, collins_def, etyma_def, gpt4_def
+
+
+def iter_source_rows(source_cursor: sqlite3.Cursor) -> Iterator[tuple]:
+    """按词合并 SOURCES_SQL 的结果，产出 compute_abstract_row 的输入行
+
+    同一词的多行各来源取 id 最大的记录，与按 str.lower 建 dict 时后写覆盖的结果一致
+    """
+    for word, group in groupby(source_cursor, key=itemgetter(0)):
+        row = list(next(group))
+        for other in group:
+            for start, end in _SOURCE_SLICES:
+                if other[start] is not None and (row[start] is None or other[start] > row[start]):
+                    row[start:end] = other[start:end]
+        yield word, row[2], row[3], row[4], row[6], row[8], row[10]
+
+
+def iter_abstract_batches(source_rows: Iterator[tuple]) -> Iterator[list[tuple]]:
+    """按批计算 abstract 行，按输入顺序产出
+
+    数据源由调用方所在的主线程读取（sqlite3 游标不能跨线程使用），
+    每批以 map_async 提交，等待最早的一批时后续批次仍在工作进程中计算
+    """
+    processes = os.cpu_count() or 1
+    if processes == 1:
+        # 单核时进程池只有序列化开销，直接在主进程中计算
+        while True:
+            batch = list(islice(source_rows, BATCH_SIZE))
+            if not batch:
+                return
+            yield [compute_abstract_row(row) for row in batch]
+
+    pending = deque()
+    with Pool(processes) as pool:
+        while True:
+            batch = list(islice(source_rows, BATCH_SIZE))
+            if batch:
+                pending.append(pool.map_async(compute_abstract_row, batch, chunksize=COMPUTE_CHUNK_SIZE))
+                if len(pending) <= processes:
+                    continue
+            elif not pending:
+                return
+            yield pending.popleft().get()
+
+
+def insert_abstracts(cursor: sqlite3.Cursor, rows: list[tuple]):
+    """批量写入 abstract"""
+    cursor.executemany("""
+        INSERT OR REPLACE INTO word_abstracts
+        (word, phonetic, main_def, collins_def, etyma_def, gpt4_def)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
+
 
 def generate_abstracts(db_path: str):
     """生成所有词的 abstract"""
     print(f"Opening database: {db_path}", flush=True)
     conn = sqlite3.connect(db_path)
+    # 离线批量构建，崩溃后重新生成即可，关闭同步换取写入速度
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # 与应用端 Rust to_lowercase() 一致的 Unicode 小写
+    conn.create_function("py_lower", 1, str.lower, deterministic=True)
     cursor = conn.cursor()
 
     # 创建 word_abstracts 表
@@ -127,120 +305,49 @@ def generate_abstracts(db_path: str):
             gpt4_def TEXT
         )
     """)
-    cursor.execute("CREATE INDEX idx_abstracts_word ON word_abstracts(word)")
     print("Table created.", flush=True)
 
-    # 批量加载所有数据到内存（避免每个词都查询数据库）
-    print("Loading all data into memory...", flush=True)
-
-    # 加载主词典
-    print("  - Loading words table...", flush=True)
-    words_data = {}
-    cursor.execute("SELECT word, phonetic_us, phonetic_uk, content FROM words")
-    for row in cursor.fetchall():
-        word_lower = row[0].lower()
-        words_data[word_lower] = (row[1], row[2], row[3])
-    print(f"    Loaded {len(words_data)} entries", flush=True)
-
-    # 加载柯林斯
-    print("  - Loading collins_words table...", flush=True)
-    collins_data = {}
-    cursor.execute("SELECT word, content FROM collins_words WHERE is_link = 0")
-    for row in cursor.fetchall():
-        word_lower = row[0].lower()
-        collins_data[word_lower] = row[1]
-    print(f"    Loaded {len(collins_data)} entries", flush=True)
-
-    # 加载词根词缀
-    print("  - Loading etyma_words table...", flush=True)
-    etyma_data = {}
-    cursor.execute("SELECT word, content FROM etyma_words WHERE is_link = 0")
-    for row in cursor.fetchall():
-        word_lower = row[0].lower()
-        etyma_data[word_lower] = row[1]
-    print(f"    Loaded {len(etyma_data)} entries", flush=True)
-
-    # 加载 GPT4
-    print("  - Loading gpt4_words table...", flush=True)
-    gpt4_data = {}
-    cursor.execute("SELECT word, content FROM gpt4_words")
-    for row in cursor.fetchall():
-        word_lower = row[0].lower()
-        gpt4_data[word_lower] = row[1]
-    print(f"    Loaded {len(gpt4_data)} entries", flush=True)
-
-    # 收集所有词
-    print("Collecting all unique words...", flush=True)
-    all_words = set()
-    all_words.update(words_data.keys())
-    all_words.update(collins_data.keys())
-    all_words.update(etyma_data.keys())
-    all_words.update(gpt4_data.keys())
-    print(f"Total unique words: {len(all_words)}", flush=True)
+    # 补建数据源索引
+    for sql in SOURCE_INDEXES_SQL:
+        cursor.execute(sql)
+
+    # 收集所有词并统计需要生成的词数
+    cursor.execute(CREATE_KEYS_SQL)
+    cursor.execute(INSERT_KEYS_SQL)
+    cursor.execute("SELECT COUNT(DISTINCT word) FROM abstract_keys")
+    total = cursor.fetchone()[0]
+    print(f"Total unique words: {total}", flush=True)
 
     print("Generating abstracts...", flush=True)
 
-    # 为每个词生成 abstract（从内存查找，不再查数据库）
+    # 只有小写词在 SQLite 中去重排序，content 按索引逐词取出，不进入临时 B 树；
+    # 按词有序输出，写入主键时是顺序追加
+    source_cursor = conn.cursor()
+    source_cursor.execute(SOURCES_SQL)
+    source_rows_iter = iter_source_rows(source_cursor)
+
+    # 摘要在工作进程中并行计算，主进程负责读取数据源和写入
     count = 0
-    total = len(all_words)
-    for word in all_words:
-        phonetic = ""
-        main_def = ""
-        collins_def = ""
-        etyma_def = ""
-        gpt4_def = ""
-
-        # 从内存查询主词典
-        if word in words_data:
-            phonetic_us, phonetic_uk, content = words_data[word]
-            phonetic = phonetic_us or phonetic_uk or ""
-            _, main_def, _ = extract_main_def(content)
-
-        # 从内存查询柯林斯
-        if word in collins_data:
-            p, collins_def = extract_collins_def(collins_data[word])
-            if not phonetic and p:
-                phonetic = p
-
-        # 从内存查询词根词缀
-        if word in etyma_data:
-            etyma_def = extract_etyma_def(etyma_data[word])
-
-        # 从内存查询 GPT4
-        if word in gpt4_data:
-            gpt4_def = extract_gpt4_def(gpt4_data[word])
-
-        # 插入 abstract
-        cursor.execute("""
-            INSERT OR REPLACE INTO word_abstracts
-            (word, phonetic, main_def, collins_def, etyma_def, gpt4_def)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (word, phonetic, main_def, collins_def, etyma_def, gpt4_def))
-
-        count += 1
-        if count % 10000 == 0:
+    for rows in iter_abstract_batches(source_rows_iter):
+        insert_abstracts(cursor, rows)
+
+        count += len(rows)
+        if count % PROGRESS_INTERVAL < len(rows) or count == total:
             pct = count * 100 // total
             print(f"  [{pct:3d}%] Processed {count}/{total} words...", flush=True)
-            conn.commit()
 
     conn.commit()
-    print(f"  [100%] Processed {count}/{total} words.", flush=True)
-
-    # 统计结果
-    cursor.execute("SELECT COUNT(*) FROM word_abstracts")
-    total = cursor.fetchone()[0]
 
-    cursor.execute("SELECT COUNT(*) FROM word_abstracts WHERE main_def != ''")
-    with_main = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM word_abstracts WHERE collins_def != ''")
-    with_collins = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM word_abstracts WHERE etyma_def != ''")
-    with_etyma = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM word_abstracts WHERE gpt4_def != ''")
-    with_gpt4 = cursor.fetchone()[0]
+    # 统计结果（单次扫描）
+    cursor.execute("""
+        SELECT COUNT(*),
+               COUNT(NULLIF(main_def, '')),
+               COUNT(NULLIF(collins_def, '')),
+               COUNT(NULLIF(etyma_def, '')),
+               COUNT(NULLIF(gpt4_def, ''))
+        FROM word_abstracts
+    """)
+    total, with_main, with_collins, with_etyma, with_gpt4 = cursor.fetchone()
 
     print(f"\n=== Summary ===")
     print(f"Total abstracts: {total}")
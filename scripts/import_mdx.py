@@ -11,21 +11,130 @@ MDX 词典导入脚本
 import json
 import re
 import sqlite3
+import threading
+from functools import lru_cache
+from itertools import islice
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
 from html.parser import HTMLParser
 from mdict_utils.reader import MDX
 
+try:
+    import orjson
+
+    def dump_json(obj) -> str:
+        """序列化为 JSON 字符串（中文按 UTF-8 原样输出）"""
+        return orjson.dumps(obj).decode('utf-8')
+except ImportError:
+    def dump_json(obj) -> str:
+        """序列化为 JSON 字符串（中文按 UTF-8 原样输出）"""
+        return json.dumps(obj, ensure_ascii=False)
+
+
+# 多进程解析时每个任务块的词条数
+PARSE_CHUNK_SIZE = 500
+
+# 每次提交给进程池的词条数，限制同时驻留内存的词条
+PARSE_WINDOW_SIZE = 20000
+
+# 每批写入数据库的词条数
+INSERT_BATCH_SIZE = 5000
+
+# 预编译正则，解析每个词条时直接复用
+_ORTH_RE = re.compile(r'^[a-zA-Z\-\' ]+$')
+_WORD_RE = re.compile(r'^([a-zA-Z][a-zA-Z\-\' ]*)')
+_POS_RE = re.compile(r'<font color=orange>\s*([a-z./]+)\s*</font>', re.I)
+_TAGS_RE = re.compile(r'<[^>]+>')
+_MEANING_RE = re.compile(r'[a-z./]\s+([^(★\d]+)', re.I)
+_ETYM_RE = re.compile(r'<font color=indianred>\(([^)]+)\)</font>', re.I)
+_FREQ_RE = re.compile(r'<font color=blue>\s*(\d+)\s*</font>', re.I)
+_STAR_FREQ_RE = re.compile(r'★+\s*(\d+)')
+_ROOT_RE = re.compile(r'<font color=teal>([^<]+)</font>', re.I)
+
 
 # ============================================================================
 # 柯林斯词典解析器
 # ============================================================================
 
+# span / div 的 class 分类，判断顺序与原先的子串匹配一致
+_SPAN_OTHER = 0
+_SPAN_WORD_KEY = 1
+_SPAN_PRON_UK = 2
+_SPAN_PRON_US = 3
+_SPAN_NUM = 4
+_SPAN_ST = 5
+_SPAN_LEVEL = 6
+_SPAN_DEF_CN = 7
+_SPAN_CHINESE_TEXT = 8
+
+_DIV_OTHER = 0
+_DIV_FORM_INFLECTED = 1
+_DIV_EXAMPLE = 2
+_DIV_CAPTION = 3
+
+
+@lru_cache(maxsize=None)
+def _span_kind(current_class: str) -> int:
+    """判断 span 的类型（class 取值有限，结果按 class 缓存）"""
+    if "word_key" in current_class:
+        return _SPAN_WORD_KEY
+    if "pron type_uk" in current_class:
+        return _SPAN_PRON_UK
+    if "pron type_us" in current_class:
+        return _SPAN_PRON_US
+    if current_class == "num":
+        return _SPAN_NUM
+    if current_class == "st":
+        return _SPAN_ST
+    if "level" in current_class and "roundRed" in current_class:
+        return _SPAN_LEVEL
+    if "def_cn" in current_class and "cn_before" in current_class:
+        # 只收集 cn_before，忽略 cn_after（内容重复）
+        return _SPAN_DEF_CN
+    if "chinese-text" in current_class:
+        return _SPAN_CHINESE_TEXT
+    # 忽略 icon-speak 等其他 span
+    return _SPAN_OTHER
+
+
+@lru_cache(maxsize=None)
+def _div_kind(current_class: str) -> int:
+    """判断 div 的类型（class 取值有限，结果按 class 缓存）"""
+    if "form_inflected" in current_class:
+        return _DIV_FORM_INFLECTED
+    if "collins_en_cn example" in current_class:
+        return _DIV_EXAMPLE
+    if "caption" in current_class and "hide_cn" in current_class:
+        return _DIV_CAPTION
+    return _DIV_OTHER
+
+
 class CollinsHTMLParser(HTMLParser):
     """解析柯林斯词典 HTML 并提取结构化数据"""
 
     def __init__(self):
-        super().__init__()
+        # 标签栈与文本缓冲在多次解析之间复用，reset() 中只重置深度并清空
+        # 标签栈：只需记录各层的 class，预分配数组并用 _depth 记录当前深度，
+        # 避免每个标签都分配元组
+        self._tag_classes: List[str] = [""] * 128
+        # 正在收集的文本片段先放入列表，闭合标签时再 join，避免字符串反复拼接
+        self._pron_uk_buf: List[str] = []  # 当前正在收集的音标
+        self._pron_us_buf: List[str] = []
+        self._def_en_buf: List[str] = []
+        self._def_cn_buf: List[str] = []
+        self._example_en_buf: List[str] = []
+        self._example_cn_buf: List[str] = []
+
+        # 保持 convert_charrefs=True：关闭后文本会在每个字符引用处被拆成多段
+        # handle_data 调用（"AT&amp;T" → "AT"、"T"），而词头等字段按整段文本取值；
+        # 不含 & 的文本 html.unescape 直接原样返回，几乎没有额外开销
+        # HTMLParser.__init__ 会调用 reset() 完成状态初始化
+        super().__init__(convert_charrefs=True)
+
+    def reset(self):
+        """重置解析状态，以便同一实例解析下一个词条"""
+        super().reset()
         self.result = {
             "word": "",
             "phonetic_uk": [],  # 改为数组，支持多发音
@@ -35,8 +144,13 @@ class CollinsHTMLParser(HTMLParser):
             "definitions": []
         }
 
-        # 标签栈，用于追踪嵌套
-        self._tag_stack: List[Tuple[str, str]] = []  # (tag, class)
+        self._depth = 0
+        self._pron_uk_buf.clear()
+        self._pron_us_buf.clear()
+        self._def_en_buf.clear()
+        self._def_cn_buf.clear()
+        self._example_en_buf.clear()
+        self._example_cn_buf.clear()
 
         # 状态跟踪
         self._in_word_key = False
@@ -44,8 +158,6 @@ class CollinsHTMLParser(HTMLParser):
         self._in_pron_us = False
         self._pron_uk_depth = 0  # 跟踪进入 pron_uk 时的栈深度
         self._pron_us_depth = 0
-        self._current_pron_uk = ""  # 当前正在收集的音标
-        self._current_pron_us = ""
         self._in_form_inflected = False
         self._in_orth = False
         self._orth_depth = 0
@@ -63,49 +175,57 @@ class CollinsHTMLParser(HTMLParser):
 
         # 当前释义
         self._current_def = None
-        self._current_example_en = ""
-        self._current_example_cn = ""
         self._collecting_en_def = False
 
         # 词频计数
         self._frequency_count = 0
 
     def handle_starttag(self, tag: str, attrs: List[Tuple[str, str]]):
-        attrs_dict = dict(attrs)
-        current_class = attrs_dict.get("class", "")
-        self._tag_stack.append((tag, current_class))
-        stack_depth = len(self._tag_stack)
+        # 只需要 class 属性，避免每个标签都构造一次 dict
+        current_class = ""
+        for name, value in attrs:
+            if name == "class":
+                current_class = value
+        stack_depth = self._depth
+        if stack_depth < len(self._tag_classes):
+            self._tag_classes[stack_depth] = current_class
+        else:
+            self._tag_classes.append(current_class)
+        stack_depth += 1
+        self._depth = stack_depth
 
         if tag == "span":
-            if "word_key" in current_class:
+            kind = _span_kind(current_class)
+            if kind == _SPAN_OTHER:
+                pass
+            elif kind == _SPAN_WORD_KEY:
                 self._in_word_key = True
-            elif "pron type_uk" in current_class:
+            elif kind == _SPAN_PRON_UK:
                 self._in_pron_uk = True
                 self._pron_uk_depth = stack_depth
-                self._current_pron_uk = ""
-            elif "pron type_us" in current_class:
+                self._pron_uk_buf.clear()
+            elif kind == _SPAN_PRON_US:
                 self._in_pron_us = True
                 self._pron_us_depth = stack_depth
-                self._current_pron_us = ""
-            elif current_class == "num":
+                self._pron_us_buf.clear()
+            elif kind == _SPAN_NUM:
                 self._in_num = True
-            elif current_class == "st":
+            elif kind == _SPAN_ST:
                 self._in_st = True
-            elif "level" in current_class and "roundRed" in current_class:
+            elif kind == _SPAN_LEVEL:
                 self._frequency_count += 1
-            elif "def_cn" in current_class and "cn_before" in current_class:
-                # 只收集 cn_before，忽略 cn_after（内容重复）
+            elif kind == _SPAN_DEF_CN:
                 self._in_def_cn = True
                 self._def_cn_depth = stack_depth
-            elif "chinese-text" in current_class:
+            else:
                 self._in_chinese_text = True
                 self._chinese_text_depth = stack_depth
-            # 忽略 icon-speak 等其他 span
 
         elif tag == "div":
-            if "form_inflected" in current_class:
+            kind = _div_kind(current_class)
+            if kind == _DIV_FORM_INFLECTED:
                 self._in_form_inflected = True
-            elif "collins_en_cn example" in current_class:
+            elif kind == _DIV_EXAMPLE:
                 self._in_example = True
                 self._current_def = {
                     "num": "",
@@ -115,7 +235,9 @@ class CollinsHTMLParser(HTMLParser):
                     "examples": [],
                     "synonyms": []
                 }
-            elif "caption" in current_class and "hide_cn" in current_class:
+                self._def_en_buf.clear()
+                self._def_cn_buf.clear()
+            elif kind == _DIV_CAPTION:
                 self._in_caption = True
                 self._collecting_en_def = True
 
@@ -133,8 +255,8 @@ class CollinsHTMLParser(HTMLParser):
             if self._in_example:
                 self._in_li = True
                 self._li_p_count = 0
-                self._current_example_en = ""
-                self._current_example_cn = ""
+                self._example_en_buf.clear()
+                self._example_cn_buf.clear()
 
         elif tag == "p":
             if self._in_li:
@@ -142,26 +264,25 @@ class CollinsHTMLParser(HTMLParser):
                 self._li_p_count += 1
 
     def handle_endtag(self, tag: str):
-        if not self._tag_stack:
+        stack_depth = self._depth
+        if not stack_depth:
             return
 
-        stack_depth = len(self._tag_stack)
-
         if tag == "span":
             # 检查是否关闭特定状态的 span
             if self._in_pron_uk and stack_depth == self._pron_uk_depth:
                 # 保存当前音标
-                pron = self._current_pron_uk.strip()
+                pron = "".join(self._pron_uk_buf).strip()
                 if pron:
                     self.result["phonetic_uk"].append(pron)
                 self._in_pron_uk = False
-                self._current_pron_uk = ""
+                self._pron_uk_buf.clear()
             elif self._in_pron_us and stack_depth == self._pron_us_depth:
-                pron = self._current_pron_us.strip()
+                pron = "".join(self._pron_us_buf).strip()
                 if pron:
                     self.result["phonetic_us"].append(pron)
                 self._in_pron_us = False
-                self._current_pron_us = ""
+                self._pron_us_buf.clear()
             elif self._in_word_key:
                 self._in_word_key = False
             elif self._in_num:
@@ -179,15 +300,21 @@ class CollinsHTMLParser(HTMLParser):
             if self._in_example:
                 # 检查是否是 collins_en_cn example div 的关闭
                 # 通过检查栈顶来判断
-                if self._tag_stack and "collins_en_cn example" in self._tag_stack[-1][1]:
-                    if self._current_def and (self._current_def["en"] or self._current_def["cn"]):
-                        self.result["definitions"].append(self._current_def)
+                if "collins_en_cn example" in self._tag_classes[stack_depth - 1]:
+                    current_def = self._current_def
+                    if current_def:
+                        # 英文释义每段文本后各跟一个空格
+                        if self._def_en_buf:
+                            current_def["en"] = " ".join(self._def_en_buf) + " "
+                        current_def["cn"] = "".join(self._def_cn_buf)
+                        if current_def["en"] or current_def["cn"]:
+                            self.result["definitions"].append(current_def)
                     self._in_example = False
                     self._current_def = None
-            if self._in_caption and self._tag_stack and "caption" in self._tag_stack[-1][1]:
+            if self._in_caption and "caption" in self._tag_classes[stack_depth - 1]:
                 self._in_caption = False
                 self._collecting_en_def = False
-            if self._in_form_inflected and self._tag_stack and "form_inflected" in self._tag_stack[-1][1]:
+            if self._in_form_inflected and "form_inflected" in self._tag_classes[stack_depth - 1]:
                 self._in_form_inflected = False
 
         elif tag == "a":
@@ -196,8 +323,8 @@ class CollinsHTMLParser(HTMLParser):
 
         elif tag == "li":
             if self._in_li and self._current_def:
-                en = self._current_example_en.strip()
-                cn = self._current_example_cn.strip()
+                en = " ".join(self._example_en_buf).strip()
+                cn = "".join(self._example_cn_buf).strip()
                 if en or cn:
                     self._current_def["examples"].append({"en": en, "cn": cn})
             self._in_li = False
@@ -207,8 +334,7 @@ class CollinsHTMLParser(HTMLParser):
             self._in_li_p = False
 
         # 出栈
-        if self._tag_stack:
-            self._tag_stack.pop()
+        self._depth = stack_depth - 1
 
     def handle_data(self, data: str):
         text = data.strip()
@@ -218,12 +344,12 @@ class CollinsHTMLParser(HTMLParser):
         if self._in_word_key:
             self.result["word"] = text
         elif self._in_pron_uk:
-            self._current_pron_uk += data  # 保留原始空格
+            self._pron_uk_buf.append(data)  # 保留原始空格
         elif self._in_pron_us:
-            self._current_pron_us += data
+            self._pron_us_buf.append(data)
         elif self._in_orth:
             # 只添加有效的词形（字母、连字符、撇号）
-            if re.match(r'^[a-zA-Z\-\' ]+$', text):
+            if _ORTH_RE.match(text):
                 self.result["forms"].append(text)
         elif self._in_num and self._current_def:
             self._current_def["num"] = text
@@ -231,20 +357,17 @@ class CollinsHTMLParser(HTMLParser):
             self._current_def["pos"] = text.strip()
         elif self._in_def_cn and self._current_def:
             # 收集中文释义（包括英文词和中文，如 "rural route的缩写"）
-            if self._current_def["cn"]:
-                self._current_def["cn"] += text
-            else:
-                self._current_def["cn"] = text
+            self._def_cn_buf.append(text)
         elif self._in_li:
             # 例句：第一个 p 是英文，第二个 p 是中文
             if self._li_p_count == 1:
-                self._current_example_en += data + " "
+                self._example_en_buf.append(data)
             elif self._li_p_count >= 2:
                 # 收集所有文本（包括数字和标点）
-                self._current_example_cn += text
+                self._example_cn_buf.append(text)
         elif self._collecting_en_def and self._current_def and not self._in_def_cn and not self._in_num and not self._in_st:
             # 收集英文释义
-            self._current_def["en"] += data + " "
+            self._def_en_buf.append(data)
 
     def get_result(self) -> Dict:
         self.result["frequency"] = self._frequency_count
@@ -264,9 +387,23 @@ class CollinsHTMLParser(HTMLParser):
         return self.result
 
 
+# 每个线程复用一个解析器实例，避免每个词条重新创建
+_parser_local = threading.local()
+
+
+def _get_collins_parser() -> CollinsHTMLParser:
+    """获取当前线程的柯林斯解析器，并重置为初始状态"""
+    parser = getattr(_parser_local, "collins", None)
+    if parser is None:
+        parser = _parser_local.collins = CollinsHTMLParser()
+    else:
+        parser.reset()
+    return parser
+
+
 def parse_collins_html(html: str) -> Dict:
     """解析柯林斯 HTML 为 JSON 结构"""
-    parser = CollinsHTMLParser()
+    parser = _get_collins_parser()
     try:
         parser.feed(html)
         return parser.get_result()
@@ -304,25 +441,25 @@ def parse_etyma_html(html: str) -> Dict:
     first_line = lines[0] if lines else html
 
     # 提取主单词（第一个非标签文本）
-    word_match = re.match(r'^([a-zA-Z][a-zA-Z\-\' ]*)', first_line)
+    word_match = _WORD_RE.match(first_line)
     if word_match:
         result["word"] = word_match.group(1).strip()
 
     # 提取词性 <font color=orange> v </font>
-    pos_match = re.search(r'<font color=orange>\s*([a-z./]+)\s*</font>', first_line, re.I)
+    pos_match = _POS_RE.search(first_line)
     if pos_match:
         result["pos"] = pos_match.group(1).strip()
 
     # 提取释义（词性后到词源前的文本）
     # 移除标签后提取
-    clean_line = re.sub(r'<[^>]+>', '', first_line)
+    clean_line = _TAGS_RE.sub('', first_line)
     # 释义在词性和括号之间
-    meaning_match = re.search(r'[a-z./]\s+([^(★\d]+)', clean_line, re.I)
+    meaning_match = _MEANING_RE.search(clean_line)
     if meaning_match:
         result["meaning"] = meaning_match.group(1).strip().strip(',')
 
     # 提取词源解释 <font color=indianred>(...)</font>
-    etymology_match = re.search(r'<font color=indianred>\(([^)]+)\)</font>', first_line, re.I)
+    etymology_match = _ETYM_RE.search(first_line)
     if etymology_match:
         result["etymology"] = etymology_match.group(1).strip()
 
@@ -331,17 +468,17 @@ def parse_etyma_html(html: str) -> Dict:
     result["stars"] = stars
 
     # 提取词频 <font color=blue>  7222 </font>
-    freq_match = re.search(r'<font color=blue>\s*(\d+)\s*</font>', first_line, re.I)
+    freq_match = _FREQ_RE.search(first_line)
     if freq_match:
         result["frequency"] = int(freq_match.group(1))
     else:
         # 也可能是直接跟在星号后面的数字
-        freq_match2 = re.search(r'★+\s*(\d+)', first_line)
+        freq_match2 = _STAR_FREQ_RE.search(first_line)
         if freq_match2:
             result["frequency"] = int(freq_match2.group(1))
 
     # 提取词根说明 <font color=teal>...</font>
-    root_match = re.search(r'<font color=teal>([^<]+)</font>', html, re.I)
+    root_match = _ROOT_RE.search(html)
     if root_match:
         result["root"] = root_match.group(1).strip()
 
@@ -352,12 +489,12 @@ def parse_etyma_html(html: str) -> Dict:
             continue
 
         # 提取单词
-        related_word_match = re.match(r'^([a-zA-Z][a-zA-Z\-\' ]*)', line)
+        related_word_match = _WORD_RE.match(line)
         if related_word_match:
             related_word = related_word_match.group(1).strip()
             if related_word and related_word != result["word"]:
                 # 提取该单词的简要信息（去掉开头的单词）
-                clean_related = re.sub(r'<[^>]+>', '', line)
+                clean_related = _TAGS_RE.sub('', line)
                 # 移除开头的单词名称
                 brief = clean_related[len(related_word):].strip()
                 result["related"].append({
@@ -403,6 +540,99 @@ def create_mdx_tables(conn: sqlite3.Connection):
     conn.commit()
 
 
+def finalize_mdx_indexes(conn: sqlite3.Connection):
+    """导入完成后创建 LOWER(word) 表达式索引，一次排序建树，代替逐行维护 B 树"""
+    cursor = conn.cursor()
+    # 应用按 LOWER(word) = LOWER(?) 查询，需要表达式索引才能走索引
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_collins_word_lower ON collins_words(LOWER(word))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_etyma_word_lower ON etyma_words(LOWER(word))")
+    conn.commit()
+
+
+# (word, content, is_link, link_target)
+EntryRow = Tuple[str, str, int, Optional[str]]
+
+
+def parse_collins_entry(entry: Tuple[bytes, bytes]) -> EntryRow:
+    """将一条柯林斯词条解析为数据库行（在工作进程中执行）"""
+    key, value = entry
+    word = key.decode('utf-8')
+
+    # 检查是否为链接（直接在字节上判断，链接词条无需解码整段内容）
+    if value.startswith(b'@@@LINK='):
+        return word, "{}", 1, value[8:].decode('utf-8').strip()
+
+    html = value.decode('utf-8')
+    parsed = parse_collins_html(html)
+    return word, dump_json(parsed), 0, None
+
+
+def parse_etyma_entry(entry: Tuple[bytes, bytes]) -> EntryRow:
+    """将一条词根词缀词条解析为数据库行（在工作进程中执行）"""
+    key, value = entry
+    word = key.decode('utf-8')
+
+    # 检查是否为链接（直接在字节上判断，链接词条无需解码整段内容）
+    if value.startswith(b'@@@LINK='):
+        return word, "{}", 1, value[8:].decode('utf-8').strip()
+
+    html = value.decode('utf-8')
+    parsed = parse_etyma_html(html)
+    return word, dump_json(parsed), 0, None
+
+
+def import_entries(
+    entries: Iterable[Tuple[bytes, bytes]],
+    total: int,
+    parse_entry: Callable[[Tuple[bytes, bytes]], EntryRow],
+    table: str,
+    conn: sqlite3.Connection,
+    progress_step: int,
+) -> Tuple[int, int]:
+    """多进程解析词条，并在主进程中批量写入数据库
+
+    工作进程只负责解析 HTML，数据库连接只在主进程中使用。
+    imap 按输入顺序返回结果，保证写入顺序与 MDX 一致。
+    词条按窗口分批提交给进程池：imap 会在后台线程中一次性读完输入，
+    直接传入生成器仍会把整部词典读进内存。
+
+    Returns:
+        (imported_count, link_count)
+    """
+    cursor = conn.cursor()
+    sql = f"INSERT INTO {table} (word, content, is_link, link_target) VALUES (?, ?, ?, ?)"
+    imported = 0
+    links = 0
+    count = 0
+    rows: List[EntryRow] = []
+    entries = iter(entries)
+
+    with Pool() as pool:
+        while True:
+            window = list(islice(entries, PARSE_WINDOW_SIZE))
+            if not window:
+                break
+
+            for row in pool.imap(parse_entry, window, chunksize=PARSE_CHUNK_SIZE):
+                if count % progress_step == 0:
+                    print(f"  处理进度: {count}/{total}")
+                count += 1
+
+                rows.append(row)
+                if row[2]:
+                    links += 1
+                else:
+                    imported += 1
+
+                if len(rows) >= INSERT_BATCH_SIZE:
+                    cursor.executemany(sql, rows)
+                    rows.clear()
+
+    cursor.executemany(sql, rows)
+    conn.commit()
+    return imported, links
+
+
 def import_collins(mdx_path: Path, conn: sqlite3.Connection) -> Tuple[int, int]:
     """导入柯林斯词典
 
@@ -412,41 +642,11 @@ def import_collins(mdx_path: Path, conn: sqlite3.Connection) -> Tuple[int, int]:
     print(f"正在读取柯林斯词典: {mdx_path}")
     mdx = MDX(str(mdx_path))
 
-    cursor = conn.cursor()
-    imported = 0
-    links = 0
-
-    items = list(mdx.items())
-    total = len(items)
+    # 词条总数取自 MDX 头部，词条本身按需流式读取
+    total = len(mdx)
     print(f"总词条数: {total}")
 
-    for i, (key, value) in enumerate(items):
-        if i % 10000 == 0:
-            print(f"  处理进度: {i}/{total}")
-
-        word = key.decode('utf-8')
-        html = value.decode('utf-8')
-
-        # 检查是否为链接
-        if html.startswith('@@@LINK='):
-            link_target = html[8:].strip()
-            cursor.execute(
-                "INSERT INTO collins_words (word, content, is_link, link_target) VALUES (?, ?, 1, ?)",
-                (word, "{}", link_target)
-            )
-            links += 1
-        else:
-            # 解析 HTML
-            parsed = parse_collins_html(html)
-            content = json.dumps(parsed, ensure_ascii=False)
-            cursor.execute(
-                "INSERT INTO collins_words (word, content, is_link, link_target) VALUES (?, ?, 0, NULL)",
-                (word, content)
-            )
-            imported += 1
-
-    conn.commit()
-    return imported, links
+    return import_entries(mdx.items(), total, parse_collins_entry, "collins_words", conn, 10000)
 
 
 def import_etyma(mdx_path: Path, conn: sqlite3.Connection) -> Tuple[int, int]:
@@ -458,45 +658,13 @@ def import_etyma(mdx_path: Path, conn: sqlite3.Connection) -> Tuple[int, int]:
     print(f"正在读取词根词缀词典: {mdx_path}")
     mdx = MDX(str(mdx_path))
 
-    cursor = conn.cursor()
-    imported = 0
-    links = 0
-
-    items = list(mdx.items())
-    total = len(items)
+    # 词条总数取自 MDX 头部，词条本身按需流式读取
+    total = len(mdx)
     print(f"总词条数: {total}")
 
-    for i, (key, value) in enumerate(items):
-        if i % 1000 == 0:
-            print(f"  处理进度: {i}/{total}")
-
-        word = key.decode('utf-8')
-        html = value.decode('utf-8')
-
-        # 跳过说明词条
-        if word.startswith('00'):
-            continue
-
-        # 检查是否为链接
-        if html.startswith('@@@LINK='):
-            link_target = html[8:].strip()
-            cursor.execute(
-                "INSERT INTO etyma_words (word, content, is_link, link_target) VALUES (?, ?, 1, ?)",
-                (word, "{}", link_target)
-            )
-            links += 1
-        else:
-            # 解析 HTML
-            parsed = parse_etyma_html(html)
-            content = json.dumps(parsed, ensure_ascii=False)
-            cursor.execute(
-                "INSERT INTO etyma_words (word, content, is_link, link_target) VALUES (?, ?, 0, NULL)",
-                (word, content)
-            )
-            imported += 1
-
-    conn.commit()
-    return imported, links
+    # 跳过说明词条
+    entries = (item for item in mdx.items() if not item[0].startswith(b'00'))
+    return import_entries(entries, total, parse_etyma_entry, "etyma_words", conn, 1000)
 
 
 def main():
@@ -523,8 +691,13 @@ def main():
     # 创建表
     create_mdx_tables(conn)
 
-    # 清空现有数据（如果有）
+    # 清空现有数据（如果有）；导入后才创建的索引先删除，清空和导入时不逐行维护
     cursor = conn.cursor()
+    cursor.execute("DROP INDEX IF EXISTS idx_collins_word_lower")
+    cursor.execute("DROP INDEX IF EXISTS idx_etyma_word_lower")
+    # generate_abstracts 用的部分索引由其自行补建
+    cursor.execute("DROP INDEX IF EXISTS idx_collins_notlink")
+    cursor.execute("DROP INDEX IF EXISTS idx_etyma_notlink")
     cursor.execute("DELETE FROM collins_words")
     cursor.execute("DELETE FROM etyma_words")
     conn.commit()
@@ -539,6 +712,9 @@ def main():
     etyma_imported, etyma_links = import_etyma(etyma_path, conn)
     print(f"词根词缀词典: 导入 {etyma_imported} 词条, {etyma_links} 链接")
 
+    # 数据全部写入后再建索引
+    finalize_mdx_indexes(conn)
+
     # 统计
     print("\n=== 统计信息 ===")
     cursor.execute("SELECT COUNT(*) FROM collins_words")
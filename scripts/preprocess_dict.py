@@ -13,8 +13,15 @@
 import json
 import sqlite3
 import zipfile
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    json_loads = json.loads
 
 # GPT4 词典路径
 GPT4_DICT_PATH = Path(r"C:\Users\hwuu\dev\github\Ceelog\DictionaryByGPT4\gptwords.json")
@@ -30,17 +37,40 @@ DICT_FILES = {
     "GMAT": ["1521164629611_GMATluan_2.zip", "1521164672691_GMAT_3.zip"],
 }
 
+# 每批写入数据库的行数，攒满即写入并释放，不为整个词典源构建行列表
+INSERT_BATCH_SIZE = 5000
+
+# 导入用的 SQL，整个导入过程复用同一游标和同一语句文本，命中预编译语句缓存
+# content 以源文件中的 UTF-8 字节绑定，CAST 按 TEXT 存储（应用按字符串读取）
+INSERT_WORD_SQL = """
+    INSERT INTO words (id, word, phonetic_us, phonetic_uk, content)
+    VALUES (?, ?, ?, ?, CAST(? AS TEXT))
+"""
+# 一个词典源的全部来源关联用一条语句写入，单词 ID 以 JSON 数组绑定
+INSERT_WORD_SOURCES_SQL = """
+    INSERT OR IGNORE INTO word_sources (word_id, source)
+    SELECT value, ? FROM json_each(?)
+"""
+INSERT_GPT4_WORD_SQL = """
+    INSERT INTO gpt4_words (word, content)
+    VALUES (?, ?)
+"""
+
 
-def create_database(db_path: Path) -> sqlite3.Connection:
-    """创建 SQLite 数据库和表结构"""
-    conn = sqlite3.connect(db_path)
+def create_database(db_path: str = ":memory:") -> sqlite3.Connection:
+    """创建 SQLite 数据库和表结构（索引在导入完成后由 finalize_indexes 创建）"""
+    # 关闭 sqlite3 模块的隐式事务，由 main 显式控制事务边界
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    # 内存数据库没有磁盘日志和文件锁，页缓存即数据本身，不需要同步、锁和缓存相关的设置；
+    # 建索引时的排序放在内存中，不写临时文件。最终文件由 VACUUM INTO 写出
+    conn.execute("PRAGMA temp_store=MEMORY")
     cursor = conn.cursor()
 
     # 创建单词表 (kajweb/dict 数据)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS words (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            word TEXT NOT NULL UNIQUE,
+            word TEXT NOT NULL,
             phonetic_us TEXT,
             phonetic_uk TEXT,
             content TEXT NOT NULL
@@ -61,107 +91,109 @@ def create_database(db_path: Path) -> sqlite3.Connection:
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS gpt4_words (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
-            word TEXT NOT NULL UNIQUE,
+            word TEXT NOT NULL,
             content TEXT NOT NULL
         )
     """)
 
-    # 创建索引
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_word ON words(word)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gpt4_words_word ON gpt4_words(word)")
-
-    conn.commit()
     return conn
 
 
-def extract_json_from_zip(zip_path: Path) -> List[Dict]:
-    """从 ZIP 文件中提取 JSON 数据"""
-    words = []
+def finalize_indexes(cursor: sqlite3.Cursor):
+    """导入完成后创建唯一索引，一次排序建树，代替逐行维护 B 树"""
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_words_word ON words(word)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_gpt4_words_word ON gpt4_words(word)")
+    # 应用和统计都按 LOWER(word) 做不区分大小写的匹配，需要表达式索引才能走索引
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_words_word_lower ON words(LOWER(word))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gpt4_words_word_lower ON gpt4_words(LOWER(word))")
+
 
+def extract_json_from_zip(zip_path: Path) -> Iterator[Tuple[bytes, Dict]]:
+    """从 ZIP 文件中逐行读取 JSON 数据，产出 (原始行, 解析结果)"""
     with zipfile.ZipFile(zip_path, 'r') as zf:
-        for name in zf.namelist():
-            if name.endswith('.json'):
-                with zf.open(name) as f:
-                    content = f.read().decode('utf-8')
-                    # 每行一个 JSON 对象
-                    for line in content.strip().split('\n'):
-                        if line.strip():
+        # 直接遍历 ZipInfo 并传给 open，不再按文件名重新查找
+        for info in zf.infolist():
+            if info.filename.endswith('.json'):
+                # 每行一个 JSON 对象，按字节行流式读取，直接解析 UTF-8 字节
+                with zf.open(info) as f:
+                    for line in f:
+                        line = line.strip()
+                        if line:
                             try:
-                                word_data = json.loads(line)
-                                words.append(word_data)
+                                yield line, json_loads(line)
                             except json.JSONDecodeError as e:
                                 print(f"JSON 解析错误: {e}")
 
-    return words
 
+def extract_word_info(line: bytes, word_data: Dict) -> Tuple[str, str, str, bytes]:
+    """从原始数据中提取单词信息，返回 (word, phonetic_us, phonetic_uk, content) 行
 
-def extract_word_info(word_data: Dict) -> Dict:
-    """从原始数据中提取单词信息"""
+    content 直接取原始行的 UTF-8 字节，不再解码和重新编码
+    """
     head_word = word_data.get("headWord", "")
 
-    # 提取音标
-    content = word_data.get("content", {})
-    word_content = content.get("word", {}).get("content", {})
+    # 提取音标，词条结构固定，直接下标取值；缺少任一层时音标为空
+    try:
+        word_content = word_data["content"]["word"]["content"]
+        phonetic_us = word_content.get("usphone", "")
+        phonetic_uk = word_content.get("ukphone", "")
+    except KeyError:
+        phonetic_us = phonetic_uk = ""
 
-    phonetic_us = word_content.get("usphone", "")
-    phonetic_uk = word_content.get("ukphone", "")
+    # 直接返回待写入的行，不再经过中间 dict
+    return head_word, phonetic_us, phonetic_uk, line  # content 保留完整原始数据
 
-    return {
-        "word": head_word,
-        "phonetic_us": phonetic_us,
-        "phonetic_uk": phonetic_uk,
-        "content": json.dumps(word_data, ensure_ascii=False)  # 保留完整原始数据
-    }
 
+def parse_zip_to_rows(zip_path: Path) -> List[tuple]:
+    """解析单个词典源文件为 (word, phonetic_us, phonetic_uk, content) 行（在工作进程中执行）"""
+    rows = []
+    for line, word_data in extract_json_from_zip(zip_path):
+        row = extract_word_info(line, word_data)
+        if row[0]:
+            rows.append(row)
+    return rows
 
-def process_dict_source(source_path: Path, source_name: str, conn: sqlite3.Connection) -> int:
-    """处理单个词典源文件"""
-    words = extract_json_from_zip(source_path)
-    cursor = conn.cursor()
+
+def process_dict_source(parsed_rows: Iterable[tuple], source_name: str, cursor: sqlite3.Cursor,
+                        word_ids: Dict[str, int]) -> int:
+    """写入单个词典源文件解析出的单词
+
+    word_ids 记录已导入的单词及其 ID，跨词典源共享：
+    单词去重在 Python 中完成，words 表导入期间不需要唯一索引
+    """
     added_count = 0
+    word_rows = []
+    source_ids = {}
+    for word, phonetic_us, phonetic_uk, content in parsed_rows:
+        # 新单词分配 ID（已存在则沿用首次导入的记录）
+        word_id = word_ids.get(word)
+        if word_id is None:
+            word_id = word_ids[word] = len(word_ids) + 1
+            word_rows.append((word_id, word, phonetic_us, phonetic_uk, content))
+            added_count += 1
 
-    for word_data in words:
-        info = extract_word_info(word_data)
-        word = info["word"]
+            if len(word_rows) >= INSERT_BATCH_SIZE:
+                cursor.executemany(INSERT_WORD_SQL, word_rows)
+                word_rows.clear()
 
-        if not word:
-            continue
+        # 词典来源关联，同一源内重复的单词只记一次
+        source_ids[word_id] = None
+
+    cursor.executemany(INSERT_WORD_SQL, word_rows)
+    cursor.execute(INSERT_WORD_SOURCES_SQL, (source_name, json.dumps(list(source_ids))))
 
-        # 尝试插入单词（如果已存在则忽略）
-        try:
-            cursor.execute("""
-                INSERT INTO words (word, phonetic_us, phonetic_uk, content)
-                VALUES (?, ?, ?, ?)
-            """, (word, info["phonetic_us"], info["phonetic_uk"], info["content"]))
-            word_id = cursor.lastrowid
-            added_count += 1
-        except sqlite3.IntegrityError:
-            # 单词已存在，获取其 ID
-            cursor.execute("SELECT id FROM words WHERE word = ?", (word,))
-            word_id = cursor.fetchone()[0]
-
-        # 添加词典来源关联
-        try:
-            cursor.execute("""
-                INSERT INTO word_sources (word_id, source)
-                VALUES (?, ?)
-            """, (word_id, source_name))
-        except sqlite3.IntegrityError:
-            # 来源关联已存在
-            pass
-
-    conn.commit()
     return added_count
 
 
-def process_gpt4_dict(gpt4_path: Path, conn: sqlite3.Connection) -> int:
+def process_gpt4_dict(gpt4_path: Path, cursor: sqlite3.Cursor) -> int:
     """处理 GPT4 词典数据"""
     if not gpt4_path.exists():
         print(f"警告: GPT4 词典文件不存在 - {gpt4_path}")
         return 0
 
-    cursor = conn.cursor()
-    added_count = 0
+    # 在内存中按词去重（保留首次出现的记录），导入期间不需要唯一索引
+    rows = []
+    seen: Set[str] = set()
 
     with open(gpt4_path, 'r', encoding='utf-8') as f:
         for line in f:
@@ -170,26 +202,27 @@ def process_gpt4_dict(gpt4_path: Path, conn: sqlite3.Connection) -> int:
                 continue
 
             try:
-                data = json.loads(line)
+                data = json_loads(line)
                 word = data.get("word", "").strip()
                 content = data.get("content", "")
 
-                if not word:
+                # content 为 null 的行不导入，也不占用该词，后续有效行仍可写入
+                if not word or word in seen or content is None:
                     continue
 
-                cursor.execute("""
-                    INSERT OR IGNORE INTO gpt4_words (word, content)
-                    VALUES (?, ?)
-                """, (word, content))
+                seen.add(word)
+                rows.append((word, content))
 
-                if cursor.rowcount > 0:
-                    added_count += 1
+                if len(rows) >= INSERT_BATCH_SIZE:
+                    cursor.executemany(INSERT_GPT4_WORD_SQL, rows)
+                    rows.clear()
 
             except json.JSONDecodeError as e:
                 print(f"JSON 解析错误: {e}")
 
-    conn.commit()
-    return added_count
+    cursor.executemany(INSERT_GPT4_WORD_SQL, rows)
+
+    return len(seen)
 
 
 def main():
@@ -204,12 +237,16 @@ def main():
     if db_path.exists():
         db_path.unlink()
 
-    print(f"创建数据库: {db_path}")
-    conn = create_database(db_path)
+    # 先在内存数据库中完成导入和建索引，最后一次性顺序写出到文件
+    print(f"创建内存数据库，完成后写入: {db_path}")
+    conn = create_database()
+    cursor = conn.cursor()
 
     total_words = 0
+    word_ids: Dict[str, int] = {}
 
-    # 处理每个词典源
+    # 收集存在的词典源文件
+    sources = []
     for source_name, files in DICT_FILES.items():
         if isinstance(files, str):
             files = [files]
@@ -219,19 +256,38 @@ def main():
             if not zip_path.exists():
                 print(f"警告: 文件不存在 - {zip_path}")
                 continue
-
-            print(f"处理: {source_name} - {file_name}")
-            added = process_dict_source(zip_path, source_name, conn)
-            print(f"  新增 {added} 个单词")
-            total_words += added
-
-    # 处理 GPT4 词典
-    print(f"\n处理: DictionaryByGPT4 - gptwords.json")
-    gpt4_added = process_gpt4_dict(GPT4_DICT_PATH, conn)
-    print(f"  新增 {gpt4_added} 个单词")
+            sources.append((source_name, file_name, zip_path))
+
+    # 全部导入在同一个事务中完成，结束时统一提交
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        # 各 ZIP 的解压和 JSON 解析在工作进程中并行进行；
+        # 主进程按 DICT_FILES 的顺序逐个写入，保证同一单词以先出现的词典源为准
+        with Pool() as pool:
+            parsed = pool.imap(parse_zip_to_rows, [zip_path for _, _, zip_path in sources])
+            for (source_name, file_name, _), parsed_rows in zip(sources, parsed):
+                print(f"处理: {source_name} - {file_name}")
+                added = process_dict_source(parsed_rows, source_name, cursor, word_ids)
+                print(f"  新增 {added} 个单词")
+                total_words += added
+
+        # 处理 GPT4 词典
+        print(f"\n处理: DictionaryByGPT4 - gptwords.json")
+        gpt4_added = process_gpt4_dict(GPT4_DICT_PATH, cursor)
+        print(f"  新增 {gpt4_added} 个单词")
+
+        # 数据全部写入后再建索引
+        finalize_indexes(cursor)
+
+        cursor.execute("COMMIT")
+    except Exception:
+        cursor.execute("ROLLBACK")
+        raise
+
+    # VACUUM INTO 按页顺序写出紧凑的数据库文件，没有空闲页
+    cursor.execute("VACUUM INTO ?", (str(db_path),))
 
     # 统计信息
-    cursor = conn.cursor()
     cursor.execute("SELECT COUNT(*) FROM words")
     unique_words = cursor.fetchone()[0]
 